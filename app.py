@@ -1,6 +1,20 @@
+import html
+import logging
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
+# Start of this script run, for the startup profile (see log_startup)
+_SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
+
+from evidence import ALL_TECHNOLOGIES, EvidenceIndex
+from sources import CellMarkerSource, load_sources
 
 # Configure page (set up layout)
 st.set_page_config(
@@ -13,14 +27,209 @@ st.set_page_config(
 # Path to the CellMarker database
 EXCEL_PATH = "data/Cell_marker_All.xlsx"
 
+# Evidence sources merged into one table (adapters live in sources.py), e.g.
+#   PanglaoDBSource("data/PanglaoDB_markers_27_Mar_2020.tsv")
+#   CuratedListSource("data/inhouse_markers.csv", name="In-house")
+DATA_SOURCES = [
+    CellMarkerSource(EXCEL_PATH),
+]
+
+# Startup stage timings, logged at DEBUG level (read by benchmarks/startup.py)
+startup_log = logging.getLogger("cell_type_anno.startup")
+
+# Per-session memory budget for cached DataFrames (see session_cached). The
+# largest objects are the raw rows and Section 3 table of one species/tissue
+# filter; raise this if the session memory report shows them being evicted.
+SESSION_MEMORY_CAP_MB = 32
+# Budget for the cached DataFrames of all sessions together; above it, the
+# least recently seen sessions lose their least recently used objects first
+PROCESS_MEMORY_CAP_MB = 512
+# Sessions idle for longer than this have their cached objects released
+SESSION_IDLE_TIMEOUT_S = 30 * 60
+# Show the per-session memory report at the bottom of the page
+SHOW_SESSION_MEMORY = False
+
+
+def log_startup(stage):
+    """Log the time from the start of this script run to ``stage``."""
+    startup_log.debug("%s %.1f", stage, (time.perf_counter() - _SCRIPT_STARTED) * 1000)
+
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    """Load the CellMarker Excel file."""
-    df = pd.read_excel(EXCEL_PATH)
+    """Load and merge all evidence sources in DATA_SOURCES.
+
+    Cached as a resource so every session shares one read-only table
+    instead of deserializing its own copy on each rerun.
+    """
+    df = load_sources(DATA_SOURCES)
     return df
 
 
+@st.cache_resource
+def load_evidence_index():
+    """Build the cumulative-by-year evidence counts once per process."""
+    return EvidenceIndex(load_data())
+
+
+def estimate_nbytes(obj):
+    """Estimate the bytes held by a DataFrame, Series or container."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_nbytes(k) + estimate_nbytes(v) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class _SessionCache(OrderedDict):
+    """LRU of one session's derived objects: {name: (key, value, nbytes)}."""
+
+
+@st.cache_resource
+def _session_registry():
+    """Process-wide registry of live sessions, shared across reruns."""
+    return {"lock": threading.Lock(), "sessions": {}}
+
+
+def _session_id():
+    """Registry key of this session, kept in its session state.
+
+    Not ``ctx.session_id``: that is not unique per session everywhere
+    (every AppTest session, as used by benchmarks/load_test.py, shares one).
+    """
+    if "_session_id" not in st.session_state:
+        st.session_state["_session_id"] = uuid.uuid4().hex
+    return st.session_state["_session_id"]
+
+
+def get_session_cache():
+    """Return this session's object cache and registry entry, releasing idle sessions.
+
+    The registry only holds a weak reference to each cache, so sessions that
+    Streamlit has already dropped disappear from it on their own; sessions
+    idle for longer than SESSION_IDLE_TIMEOUT_S are cleared here.
+    """
+    cache = st.session_state.get("_session_cache")
+    if cache is None:
+        cache = st.session_state["_session_cache"] = _SessionCache()
+
+    registry = _session_registry()
+    now = time.monotonic()
+
+    with registry["lock"]:
+        sessions = registry["sessions"]
+        entry = sessions.setdefault(
+            _session_id(), {"grid_nbytes": {}, "cached_nbytes": 0, "cached_objects": 0}
+        )
+        entry["last_seen"] = now
+        entry["cache"] = weakref.ref(cache)
+
+        for sid, other in list(sessions.items()):
+            other_cache = other["cache"]()
+            if other_cache is None:
+                del sessions[sid]
+            elif now - other["last_seen"] > SESSION_IDLE_TIMEOUT_S:
+                other_cache.clear()
+                del sessions[sid]
+
+    return cache, entry
+
+
+def session_cached(name, key, compute):
+    """Return ``compute()`` memoised in this session under ``name`` for ``key``.
+
+    Only the latest key is kept per name. When the session's cached objects
+    exceed SESSION_MEMORY_CAP_MB, or all sessions' exceed
+    PROCESS_MEMORY_CAP_MB, the least recently used ones are evicted and
+    recomputed by the next rerun that needs them.
+
+    Caches are only read or changed with the registry lock held, and the
+    session's totals are kept in its registry entry for the memory report.
+    """
+    cache, entry = get_session_cache()
+    registry = _session_registry()
+    with registry["lock"]:
+        cached = cache.get(name)
+        if cached is not None and cached[0] == key:
+            cache.move_to_end(name)
+            return cached[1]
+
+    value = compute()
+    nbytes = estimate_nbytes(value)
+
+    with registry["lock"]:
+        replaced = cache.pop(name, None)
+        entry["cached_nbytes"] += nbytes - (replaced[2] if replaced is not None else 0)
+        cache[name] = (key, value, nbytes)
+        _evict(entry, SESSION_MEMORY_CAP_MB * 2**20)
+
+        # Keep all sessions together within PROCESS_MEMORY_CAP_MB
+        sessions = registry["sessions"].values()
+        excess = sum(other["cached_nbytes"] for other in sessions) - PROCESS_MEMORY_CAP_MB * 2**20
+        for other in sorted(sessions, key=lambda other: other["last_seen"]):
+            if excess <= 0:
+                break
+            before = other["cached_nbytes"]
+            _evict(other, before - excess)
+            excess -= before - other["cached_nbytes"]
+    return value
+
+
+def _evict(entry, limit):
+    """Drop a session's least recently used objects until it holds at most ``limit`` bytes.
+
+    Call with the registry lock held.
+    """
+    cache = entry["cache"]()
+    if cache is None:
+        entry["cached_nbytes"] = entry["cached_objects"] = 0
+        return
+    while entry["cached_nbytes"] > limit and cache:
+        _, (_, _, nbytes) = cache.popitem(last=False)
+        entry["cached_nbytes"] -= nbytes
+    entry["cached_objects"] = len(cache)
+
+
+def record_grid_response(name, grid_result):
+    """Account for the data an AgGrid response keeps in this session."""
+    nbytes = estimate_nbytes(getattr(grid_result, "data", None))
+    nbytes += estimate_nbytes(getattr(grid_result, "selected_rows", None))
+
+    registry = _session_registry()
+    with registry["lock"]:
+        entry = registry["sessions"].get(_session_id())
+        if entry is not None:
+            entry["grid_nbytes"][name] = nbytes
+
+
+def session_memory_report():
+    """Estimated bytes held by each live session, one row per session."""
+    registry = _session_registry()
+    now = time.monotonic()
+    rows = []
+    with registry["lock"]:
+        for sid, entry in registry["sessions"].items():
+            if entry["cache"]() is None:
+                continue
+            cached = entry["cached_nbytes"]
+            grids = sum(entry["grid_nbytes"].values())
+            rows.append({
+                "Session": sid[:8],
+                "Cached objects": entry["cached_objects"],
+                "Cached MB": cached / 2**20,
+                "Grid responses MB": grids / 2**20,
+                "Total MB": (cached + grids) / 2**20,
+                "Idle (s)": int(now - entry["last_seen"]),
+            })
+    return pd.DataFrame(rows)
+
+
 def create_aggrid_config(df, enable_selection=False, selection_mode='single', link_columns=None):
     """创建 AgGrid 配置
 
@@ -30,6 +239,9 @@ def create_aggrid_config(df, enable_selection=False, selection_mode='single', li
         selection_mode: 选择模式 ('single' 或 'multiple')
         link_columns: 需要渲染为链接的列名列表
     """
+    # st_aggrid is imported on first use so it does not delay the first paint
+    from st_aggrid import GridOptionsBuilder, JsCode
+
     gb = GridOptionsBuilder.from_dataframe(df)
 
     # 配置默认列：启用筛选、排序、调整大小
@@ -97,7 +309,248 @@ def create_aggrid_config(df, enable_selection=False, selection_mode='single', li
     return gb.build()
 
 
+def group_markers(df_counts, species, tissue_class, cell_type="All"):
+    """Shape the evidence counts of one species & tissue for Section 1."""
+    df_grouped = df_counts
+    if cell_type != "All":
+        df_grouped = df_grouped[df_grouped["cell_name"] == cell_type]
+    df_grouped = df_grouped.copy()
+
+    # Add species and tissue_class columns at the beginning
+    df_grouped.insert(0, "species", species)
+    df_grouped.insert(1, "tissue_class", tissue_class)
+
+    # Sort by count (descending by default)
+    df_grouped = df_grouped.sort_values("count", ascending=False)
+
+    # Rename columns
+    df_grouped = df_grouped.rename(
+        columns={
+            "species": "Species",
+            "tissue_class": "Tissue",
+            "cell_type": "Normal/Tumor",
+            "cell_name": "Cell type",
+            "marker": "Marker",
+            "Symbol": "Symbol",
+            "count": "#Evidence",
+        }
+    )
+
+    return df_grouped
+
+
+def filter_raw_rows(df, species, tissue_class, technology=ALL_TECHNOLOGIES, years=None):
+    """Raw rows behind EvidenceIndex.counts() for the same filters."""
+    mask = (df["species"] == species) & (df["tissue_class"] == tissue_class)
+    if technology != ALL_TECHNOLOGIES:
+        mask &= df["technology_seq"] == technology
+    if years is not None:
+        mask &= df["year"].between(*years)
+    return df[mask]
+
+
+def build_raw_results(df_filtered, df_grouped):
+    """Select the raw evidence rows behind Section 1 for Section 3."""
+    # Filter original raw data by Section 1's Cell type and Marker (using new column names)
+    section1_cell_names = df_grouped["Cell type"].dropna().unique()
+    section1_markers = df_grouped["Marker"].dropna().unique()
+
+    df_result = df_filtered[
+        df_filtered["cell_name"].isin(section1_cell_names)
+        & df_filtered["marker"].isin(section1_markers)
+    ].copy()
+
+    # Remove unwanted columns
+    columns_to_drop = ["uberonongology_id", "cellontology_id"]
+    df_result = df_result.drop(
+        columns=[col for col in columns_to_drop if col in df_result.columns])
+
+    # Rename and capitalize columns (replace underscores with spaces)
+    column_mapping = {
+        "species": "Species",
+        "tissue_class": "Tissue",
+        "tissue_type": "Tissue type",
+        "cancer_type": "Cancer type",
+        "cell_type": "Normal/Tumor",
+        "cell_name": "Cell type",
+        "marker": "Marker",
+        "Symbol": "Symbol",
+        "GeneID": "Gene ID",
+        "Genetype": "Gene type",
+        "Genename": "Gene name",
+        "UNIPROTID": "UNIPROT ID",
+        "technology_seq": "Technology seq",
+        "marker_source": "Marker source",
+        "database": "Database",
+        "PMID": "PMID",
+        "Title": "Title",
+        "journal": "Journal",
+        "year": "Year",
+    }
+    df_result = df_result.rename(columns=column_mapping)
+
+    # Create PMID links
+    df_result["PMID"] = df_result["PMID"].apply(
+        lambda x: f"https://pubmed.ncbi.nlm.nih.gov/{int(x)}/" if pd.notna(x) and x != "" else ""
+    )
+
+    # Reset index
+    df_result = df_result.reset_index(drop=True)
+
+    return df_result
+
+
+# Styles of the Section 3 detail card, injected once at the top of the page
+DETAIL_CARD_CSS = """
+<style>
+.detail-card {
+    border: 1px solid #d1d5db;
+    border-radius: 12px;
+    padding: 24px;
+    margin: 20px 0;
+    background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%);
+    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+}
+.detail-card-title {
+    font-size: 1.5rem;
+    font-weight: 600;
+    color: #1e40af;
+    margin: 0 0 16px 0;
+    padding-bottom: 12px;
+    border-bottom: 2px solid #3b82f6;
+    display: flex;
+    align-items: center;
+    gap: 8px;
+}
+.detail-section {
+    margin: 20px 0;
+    padding: 16px;
+    background-color: #f0f9ff;
+    border-radius: 8px;
+    border-left: 4px solid #3b82f6;
+}
+.detail-section-title {
+    font-size: 1.1rem;
+    font-weight: 600;
+    color: #1e3a8a;
+    margin: 0 0 12px 0;
+    display: flex;
+    align-items: center;
+    gap: 6px;
+}
+.detail-field {
+    padding: 6px 0;
+    border-bottom: 1px solid #e5e7eb;
+}
+.detail-field:last-child {
+    border-bottom: none;
+}
+.detail-label {
+    font-weight: 600;
+    color: #374151;
+}
+.detail-value {
+    color: #6b7280;
+    word-break: break-word;
+}
+.detail-columns {
+    display: flex;
+    gap: 24px;
+}
+.detail-columns > div {
+    flex: 1;
+    min-width: 0;
+}
+</style>
+"""
+
+# Sections of the Section 3 detail card: (icon, title, columns, two-column layout)
+DETAIL_CARD_SECTIONS = [
+    ("🧬", "Gene Information", ["Symbol", "Gene ID", "Gene name", "Gene type", "UNIPROT ID"], True),
+    (
+        "🔬",
+        "Cell & Marker Information",
+        ["Species", "Tissue class", "Tissue type", "Cancer type", "Normal/Tumor", "Cell type", "Marker"],
+        True,
+    ),
+    ("📚", "Literature Information", ["PMID", "Title", "journal", "Year"], False),
+    ("⚙️", "Additional Information", ["Technology seq", "Marker source", "Database"], False),
+]
+DETAIL_CARD_COLUMNS = [col for _, _, cols, _ in DETAIL_CARD_SECTIONS for col in cols]
+
+
+def _detail_field_html(col, val):
+    """One label/value line of the detail card."""
+    if isinstance(val, str) and val.startswith("http"):
+        url = html.escape(val, quote=True)
+        text = "📖 View Article" if col == "PMID" else url
+        value = f'<a href="{url}" target="_blank">{text}</a>'
+    else:
+        if col in ("Gene ID", "Year"):
+            # Convert to integer
+            try:
+                val = int(float(val))
+            except (ValueError, TypeError):
+                pass
+        # Blank lines would end the HTML block in markdown
+        text = html.escape(str(val)).replace("\n", " ")
+        value = f'<span class="detail-value">{text}</span>'
+    return f'<div class="detail-field"><span class="detail-label">{col}:</span> {value}</div>'
+
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def detail_card_html(row_number, fields):
+    """Render the whole detail card for one row as a single HTML string.
+
+    Args:
+        row_number: 1-based row number shown in the card title
+        fields: tuple of (column, value) pairs of the row; cached on these,
+            so reopening a row reuses its rendered card
+    """
+    values = dict(fields)
+    parts = [
+        '<div class="detail-card">',
+        '<div class="detail-card-title">',
+        f"<span>📋</span><span>Entry Details (Row {row_number})</span>",
+        "</div>",
+    ]
+
+    for icon, title, cols, two_columns in DETAIL_CARD_SECTIONS:
+        available_cols = [col for col in cols if col in values]
+        if not available_cols:
+            continue
+
+        parts.append(
+            '<div class="detail-section"><div class="detail-section-title">'
+            f"<span>{icon}</span><span>{title}</span></div>"
+        )
+        if two_columns:
+            # Left column gets the extra field when the count is odd
+            split = (len(available_cols) + 1) // 2
+            columns = [available_cols[:split], available_cols[split:]]
+        else:
+            columns = [available_cols]
+
+        parts.append('<div class="detail-columns">')
+        for column_cols in columns:
+            parts.append("<div>")
+            for col in column_cols:
+                val = values[col]
+                if pd.notna(val) and val != "":
+                    parts.append(_detail_field_html(col, val))
+            parts.append("</div>")
+        parts.append("</div>")
+        parts.append("</div>")
+
+    parts.append("</div>")
+    return "".join(parts)
+
+
 def main():
+    # Detail card styles: identical and at the same position on every rerun,
+    # so the frontend keeps its existing style element
+    st.markdown(DETAIL_CARD_CSS, unsafe_allow_html=True)
+
     st.title("🔍 Cell Type Annotation Tool")
     st.write("""
     👋欢迎使用本工具！
@@ -155,9 +608,16 @@ def main():
     """)
 
 
+    log_startup("first_paint")
+
     # Load data
     with st.spinner("Loading data..."):
         df = load_data()
+        evidence_index = load_evidence_index()
+    log_startup("data_loaded")
+
+    # Grid component, only needed once there is data to show
+    from st_aggrid import AgGrid, GridUpdateMode
 
     # ============================================================
     # Section 1: Marker探索
@@ -168,18 +628,21 @@ def main():
     col1, col2, col3 = st.columns(3)
 
     # Get unique species
-    species_list = df["species"].dropna().unique().tolist()
-    species_list = sorted(species_list)
+    species_list = session_cached(
+        "species_list", None, lambda: sorted(df["species"].dropna().unique().tolist())
+    )
 
     with col1:
         selected_species = st.selectbox("Select Species", species_list)
 
-    # Filter by species first
-    df_filtered = df[df["species"] == selected_species]
-
     # Get unique tissue_class for selected species
-    tissue_class_list = df_filtered["tissue_class"].dropna().unique().tolist()
-    tissue_class_list = sorted(tissue_class_list)
+    tissue_class_list = session_cached(
+        "tissue_class_list",
+        selected_species,
+        lambda: sorted(
+            df.loc[df["species"] == selected_species, "tissue_class"].dropna().unique().tolist()
+        ),
+    )
 
     with col2:
         # Set default to "Brain" if available, otherwise first option
@@ -192,15 +655,59 @@ def main():
 
     
     
-    # Filter by tissue_class
-    df_filtered = df_filtered[df_filtered["tissue_class"] == selected_tissue_class]
+    # Publication year and technology filters
+    col4, col5, col6 = st.columns(3)
+
+    with col4:
+        if evidence_index.first_year < evidence_index.last_year:
+            selected_years = st.slider(
+                "Publication year",
+                min_value=evidence_index.first_year,
+                max_value=evidence_index.last_year,
+                value=(evidence_index.first_year, evidence_index.last_year),
+                step=1,
+            )
+        else:
+            selected_years = (evidence_index.first_year, evidence_index.last_year)
+    all_years = selected_years == (evidence_index.first_year, evidence_index.last_year)
 
-    # Group by cell_name
-    groupby_cols = ["cell_name"]
-    df_grouped = df_filtered.groupby(groupby_cols, dropna=False).size().reset_index(name="count")
-    df_grouped = df_grouped.sort_values("count", ascending=False)
-    # Get unique celltypes
-    celltypes_list = ["All"] + df_grouped["cell_name"].dropna().unique().tolist()
+    with col5:
+        selected_technology = st.selectbox(
+            "Select Technology", [ALL_TECHNOLOGIES] + evidence_index.technologies()
+        )
+
+    with col6:
+        # Both counts are precomputed, so switching costs nothing
+        count_mode = st.radio(
+            "Count #Evidence as", ["Rows", "Distinct PMIDs"], horizontal=True,
+            help="Rows counts every database entry; Distinct PMIDs counts each publication once.",
+        )
+
+    filter_key = (selected_species, selected_tissue_class, selected_technology, selected_years)
+    count_key = filter_key + (count_mode,)
+
+    # Evidence counts per cell type & marker, served from the prefix-sum index
+    df_counts = session_cached(
+        "df_counts",
+        count_key,
+        lambda: evidence_index.counts(
+            selected_species,
+            selected_tissue_class,
+            technology=selected_technology,
+            years=None if all_years else selected_years,
+            distinct_pmids=count_mode == "Distinct PMIDs",
+        ),
+    )
+
+    # Get unique celltypes, ordered by evidence count
+    celltypes_list = session_cached(
+        "celltypes_list",
+        count_key,
+        lambda: ["All"] + (
+            df_counts.groupby("cell_name", dropna=False)["count"].sum()
+            .sort_values(ascending=False).index.dropna().unique().tolist()
+        ),
+    )
     
     with col3:
         # Set default to "All"
@@ -208,33 +715,12 @@ def main():
         "Select Cell type", celltypes_list, index=celltypes_list.index("All")
     )
 
-    
-    # Group by and count
-    groupby_cols = ["cell_type", "cell_name", "marker", "Symbol"]
-    df_grouped = df_filtered.groupby(groupby_cols, dropna=False).size().reset_index(name="count")
-
-    if selected_cell_type != "All":
-        df_grouped = df_grouped[df_grouped["cell_name"] == selected_cell_type]
-
-    
-    # Add species and tissue_class columns at the beginning
-    df_grouped.insert(0, "species", selected_species)
-    df_grouped.insert(1, "tissue_class", selected_tissue_class)
-
-    # Sort by count (descending by default)
-    df_grouped = df_grouped.sort_values("count", ascending=False)
-
-    # Rename columns
-    df_grouped = df_grouped.rename(
-        columns={
-            "species": "Species",
-            "tissue_class": "Tissue",
-            "cell_type": "Normal/Tumor",
-            "cell_name": "Cell type",
-            "marker": "Marker",
-            "Symbol": "Symbol",
-            "count": "#Evidence",
-        }
+    df_grouped = session_cached(
+        "df_grouped",
+        count_key + (selected_cell_type,),
+        lambda: group_markers(
+            df_counts, selected_species, selected_tissue_class, selected_cell_type
+        ),
     )
 
     # Display results
@@ -254,9 +740,10 @@ def main():
     # 创建 AgGrid 配置（不需要行选择）
     grid_options = create_aggrid_config(df_grouped, enable_selection=False)
 
-    # 显示 AgGrid
+    # 显示 AgGrid. st_aggrid adds a row-id column to the frame it is given,
+    # so hand it a copy rather than the session-cached df_grouped.
     AgGrid(
-        df_grouped,
+        df_grouped.copy(deep=False),
         gridOptions=grid_options,
         height=dynamic_height,
         width='100%',
@@ -272,7 +759,8 @@ def main():
     st.header("2️⃣ 获取marker清单代码")
 
     # Get max count for slider range
-    max_count = int(df_grouped["#Evidence"].max())
+    # No entries can match a narrow year or technology filter
+    max_count = int(df_grouped["#Evidence"].max()) if len(df_grouped) else 1
     default_value = min(max_count, 3)
 
     if max_count == 1:
@@ -332,14 +820,24 @@ def main():
     st.divider()
     st.header("3️⃣ 文献证据追溯")
 
-    # Filter original raw data by Section 1's Cell type and Marker (using new column names)
-    section1_cell_names = df_grouped["Cell type"].dropna().unique()
-    section1_markers = df_grouped["Marker"].dropna().unique()
+    # Raw rows of the selected species & tissue, under the same year and technology filters
+    df_filtered = session_cached(
+        "df_filtered",
+        filter_key,
+        lambda: filter_raw_rows(
+            df,
+            selected_species,
+            selected_tissue_class,
+            technology=selected_technology,
+            years=None if all_years else selected_years,
+        ),
+    )
 
-    df_result = df_filtered[
-        df_filtered["cell_name"].isin(section1_cell_names)
-        & df_filtered["marker"].isin(section1_markers)
-    ].copy()
+    df_result = session_cached(
+        "df_result",
+        count_key + (selected_cell_type,),
+        lambda: build_raw_results(df_filtered, df_grouped),
+    )
 
     # # Get all unique values (using new column names from df_grouped)
     # all_cell_names = sorted(df_grouped["Cell type"].dropna().unique().tolist())
@@ -403,45 +901,9 @@ def main():
     # if selected_marker != "All":
     #     df_result = df_result[df_result["marker"] == selected_marker]
 
-    # Remove unwanted columns
-    columns_to_drop = ["uberonongology_id", "cellontology_id"]
-    df_result = df_result.drop(
-        columns=[col for col in columns_to_drop if col in df_result.columns])
-
-    # Rename and capitalize columns (replace underscores with spaces)
-    column_mapping = {
-        "species": "Species",
-        "tissue_class": "Tissue",
-        "tissue_type": "Tissue type",
-        "cancer_type": "Cancer type",
-        "cell_type": "Normal/Tumor",
-        "cell_name": "Cell type",
-        "marker": "Marker",
-        "Symbol": "Symbol",
-        "GeneID": "Gene ID",
-        "Genetype": "Gene type",
-        "Genename": "Gene name",
-        "UNIPROTID": "UNIPROT ID",
-        "technology_seq": "Technology seq",
-        "marker_source": "Marker source",
-        "PMID": "PMID",
-        "Title": "Title",
-        "journal": "Journal",
-        "year": "Year",
-    }
-    df_result = df_result.rename(columns=column_mapping)
-
-    # Create PMID links
-    df_result["PMID"] = df_result["PMID"].apply(
-        lambda x: f"https://pubmed.ncbi.nlm.nih.gov/{int(x)}/" if pd.notna(x) and x != "" else ""
-    )
-
     # Display results
     st.subheader(f"Raw Data Results: {len(df_result)} entries")
 
-    # Reset index
-    df_result = df_result.reset_index(drop=True)
-
     # Calculate dynamic height based on row count (max 10 rows)
     row_count = min(len(df_result), 10)
     # Approximate 40px per row + 50px for header
@@ -456,9 +918,9 @@ def main():
         link_columns=['PMID']  # PMID 列渲染为可点击链接
     )
 
-    # 显示 AgGrid
+    # 显示 AgGrid (a copy, as above: df_result is session-cached)
     grid_result = AgGrid(
-        df_result,
+        df_result.copy(deep=False),
         gridOptions=grid_options,
         height=dynamic_height,
         width='100%',
@@ -468,6 +930,7 @@ def main():
         fit_columns_on_grid_load=False,  # 不强制适应宽度，允许横向滚动
         allow_unsafe_jscode=True,  # 允许使用自定义 JsCode (cellRenderer)
     )
+    record_grid_response("section3", grid_result)
 
     # Check if a row is selected
     # 从 grid_result 中获取选中行
@@ -522,275 +985,16 @@ def main():
         if 0 <= row_idx < len(df_result):
             row_data = df_result.iloc[row_idx]
 
-            # Enhanced CSS for styled card
-            st.markdown(
-                """
-            <style>
-            .detail-card {
-                border: 1px solid #d1d5db;
-                border-radius: 12px;
-                padding: 24px;
-                margin: 20px 0;
-                background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%);
-                box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-            }
-            .detail-card-title {
-                font-size: 1.5rem;
-                font-weight: 600;
-                color: #1e40af;
-                margin: 0 0 16px 0;
-                padding-bottom: 12px;
-                border-bottom: 2px solid #3b82f6;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-            }
-            .detail-section {
-                margin: 20px 0;
-                padding: 16px;
-                background-color: #f0f9ff;
-                border-radius: 8px;
-                border-left: 4px solid #3b82f6;
-            }
-            .detail-section-title {
-                font-size: 1.1rem;
-                font-weight: 600;
-                color: #1e3a8a;
-                margin: 0 0 12px 0;
-                display: flex;
-                align-items: center;
-                gap: 6px;
-            }
-            .detail-field {
-                padding: 6px 0;
-                border-bottom: 1px solid #e5e7eb;
-            }
-            .detail-field:last-child {
-                border-bottom: none;
-            }
-            .detail-label {
-                font-weight: 600;
-                color: #374151;
-            }
-            .detail-value {
-                color: #6b7280;
-                word-break: break-word;
-            }
-            </style>
-            """,
-                unsafe_allow_html=True,
-            )
-
-            # Detail card with enhanced styling
+            # Detail card: one precompiled HTML element per row
             with st.container(border=True):
                 st.markdown(
-                    f"""
-                <div class="detail-card">
-                    <div class="detail-card-title">
-                        <span>📋</span>
-                        <span>Entry Details (Row {row_idx + 1})</span>
-                    </div>
-                </div>
-                """,
+                    detail_card_html(
+                        row_idx + 1,
+                        tuple((col, row_data[col]) for col in DETAIL_CARD_COLUMNS if col in row_data.index),
+                    ),
                     unsafe_allow_html=True,
                 )
 
-                # Gene information section (two columns)
-                gene_cols = ["Symbol", "Gene ID", "Gene name", "Gene type", "UNIPROT ID"]
-                available_gene_cols = [col for col in gene_cols if col in df_result.columns]
-
-                if available_gene_cols:
-                    st.markdown(
-                        """
-                    <div class="detail-section">
-                        <div class="detail-section-title">
-                            <span>🧬</span>
-                            <span>Gene Information</span>
-                        </div>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-                    gene_col1, gene_col2 = st.columns(2)
-
-                    with gene_col1:
-                        st.markdown('<div class="detail-field">', unsafe_allow_html=True)
-                        for col in available_gene_cols[
-                            : len(available_gene_cols) // 2 + len(available_gene_cols) % 2
-                        ]:
-                            val = row_data[col]
-                            if pd.notna(val) and val != "":
-                                if isinstance(val, str) and val.startswith("http"):
-                                    st.markdown(
-                                        f'<span class="detail-label">{col}:</span> <a href="{val}" target="_blank">{val}</a>',
-                                        unsafe_allow_html=True,
-                                    )
-                                elif col == "Gene ID":
-                                    # Convert to integer
-                                    try:
-                                        val_int = int(float(val))
-                                        st.markdown(
-                                            f'<span class="detail-label">{col}:</span> <span class="detail-value">{val_int}</span>',
-                                            unsafe_allow_html=True,
-                                        )
-                                    except (ValueError, TypeError):
-                                        st.markdown(
-                                            f'<span class="detail-label">{col}:</span> <span class="detail-value">{val}</span>',
-                                            unsafe_allow_html=True,
-                                        )
-                                else:
-                                    st.markdown(
-                                        f'<span class="detail-label">{col}:</span> <span class="detail-value">{val}</span>',
-                                        unsafe_allow_html=True,
-                                    )
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                    with gene_col2:
-                        st.markdown('<div class="detail-field">', unsafe_allow_html=True)
-                        for col in available_gene_cols[
-                            len(available_gene_cols) // 2 + len(available_gene_cols) % 2:
-                        ]:
-                            val = row_data[col]
-                            if pd.notna(val) and val != "":
-                                if isinstance(val, str) and val.startswith("http"):
-                                    st.markdown(
-                                        f'<span class="detail-label">{col}:</span> <a href="{val}" target="_blank">{val}</a>',
-                                        unsafe_allow_html=True,
-                                    )
-                                else:
-                                    st.markdown(
-                                        f'<span class="detail-label">{col}:</span> <span class="detail-value">{val}</span>',
-                                        unsafe_allow_html=True,
-                                    )
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                # Cell & Marker information section (two columns)
-                cell_marker_cols = [
-                    "Species",
-                    "Tissue class",
-                    "Tissue type",
-                    "Cancer type",
-                    "Normal/Tumor",
-                    "Cell type",
-                    "Marker",
-                ]
-                available_cell_marker_cols = [
-                    col for col in cell_marker_cols if col in df_result.columns
-                ]
-
-                if available_cell_marker_cols:
-                    st.markdown(
-                        """
-                    <div class="detail-section">
-                        <div class="detail-section-title">
-                            <span>🔬</span>
-                            <span>Cell & Marker Information</span>
-                        </div>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-                    cell_col1, cell_col2 = st.columns(2)
-
-                    with cell_col1:
-                        st.markdown('<div class="detail-field">', unsafe_allow_html=True)
-                        for col in available_cell_marker_cols[
-                            : len(available_cell_marker_cols) // 2
-                            + len(available_cell_marker_cols) % 2
-                        ]:
-                            val = row_data[col]
-                            if pd.notna(val) and val != "":
-                                st.markdown(
-                                    f'<span class="detail-label">{col}:</span> <span class="detail-value">{val}</span></div>',
-                                    unsafe_allow_html=True,
-                                )
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                    with cell_col2:
-                        st.markdown('<div class="detail-field">', unsafe_allow_html=True)
-                        for col in available_cell_marker_cols[
-                            len(available_cell_marker_cols) // 2
-                            + len(available_cell_marker_cols) % 2:
-                        ]:
-                            val = row_data[col]
-                            if pd.notna(val) and val != "":
-                                st.markdown(
-                                    f'<div class="detail-field"><span class="detail-label">{col}:</span> <span class="detail-value">{val}</span></div>',
-                                    unsafe_allow_html=True,
-                                )
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-                # Literature information section
-                lit_cols = ["PMID", "Title", "journal", "Year"]
-                available_lit_cols = [col for col in lit_cols if col in df_result.columns]
-
-                if available_lit_cols:
-                    st.markdown(
-                        """
-                    <div class="detail-section">
-                        <div class="detail-section-title">
-                            <span>📚</span>
-                            <span>Literature Information</span>
-                        </div>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-                    for col in available_lit_cols:
-                        val = row_data[col]
-                        if pd.notna(val) and val != "":
-                            if col == "PMID" and isinstance(val, str) and val.startswith("http"):
-                                st.markdown(
-                                    f'<div class="detail-field"><span class="detail-label">{col}:</span> <a href="{val}" target="_blank">📖 View Article</a></div>',
-                                    unsafe_allow_html=True,
-                                )
-                            elif col == "Year":
-                                # Convert to integer
-                                try:
-                                    val_int = int(float(val))
-                                    st.markdown(
-                                        f'<div class="detail-field"><span class="detail-label">{col}:</span> <span class="detail-value">{val_int}</span></div>',
-                                        unsafe_allow_html=True,
-                                    )
-                                except (ValueError, TypeError):
-                                    st.markdown(
-                                        f'<div class="detail-field"><span class="detail-label">{col}:</span> <span class="detail-value">{val}</span></div>',
-                                        unsafe_allow_html=True,
-                                    )
-                            else:
-                                st.markdown(
-                                    f'<div class="detail-field"><span class="detail-label">{col}:</span> <span class="detail-value">{val}</span></div>',
-                                    unsafe_allow_html=True,
-                                )
-
-                # Other information section
-                other_cols = ["Technology seq", "Marker source"]
-                available_other_cols = [col for col in other_cols if col in df_result.columns]
-
-                if available_other_cols:
-                    st.markdown(
-                        """
-                    <div class="detail-section">
-                        <div class="detail-section-title">
-                            <span>⚙️</span>
-                            <span>Additional Information</span>
-                        </div>
-                    </div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
-
-                    for col in available_other_cols:
-                        val = row_data[col]
-                        if pd.notna(val) and val != "":
-                            st.markdown(
-                                f'<div class="detail-field"><span class="detail-label">{col}:</span> <span class="detail-value">{val}</span></div>',
-                                unsafe_allow_html=True,
-                            )
-
                 # Close button
                 st.markdown("---")
                 col_close1, col_close2, col_close3 = st.columns([1, 2, 1])
@@ -803,6 +1007,10 @@ def main():
         if len(df_result) == 0:
             st.info("No data to display")
 
+    if SHOW_SESSION_MEMORY:
+        with st.expander("Session memory"):
+            st.dataframe(session_memory_report(), hide_index=True)
+
     # 在页面底部添加创建者信息
     st.markdown("---")  # 分隔线
     st.markdown("""
@@ -811,6 +1019,8 @@ def main():
     - **神秘人Ender**
     """, unsafe_allow_html=True)
 
+    log_startup("rendered")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,306 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Drives N headless sessions of ``app.py`` through Streamlit's ``AppTest``
+inside this one process (the same way ``streamlit run`` executes every
+browser session on a thread of a single server process) and reports rerun
+latency percentiles, CPU and RSS as N grows.
+
+Each session repeats a realistic interaction sequence:
+
+    initial load -> change species -> change tissue -> move the
+    #Evidence threshold slider -> select a Section 3 row -> close the card
+
+Usage (from the repository root):
+
+    python benchmarks/load_test.py --sessions 1,2,4,8 --rounds 3
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, fall back to /proc and getrusage
+    psutil = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+def share_server_state():
+    """Make concurrent AppTest sessions share state the way a server does.
+
+    Every AppTest run installs a fresh mock Runtime and ScriptCache and clears
+    the Runtime when it finishes, which breaks runs still going on other
+    threads. A real server has one Runtime and compiles the script once, so
+    keep the last Runtime installed and share one compiled script.
+    """
+    last_runtime = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime[:] = [cls._instance]
+            return cls._instance
+        if last_runtime:
+            return last_runtime[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last_runtime))
+
+    compile_lock = threading.Lock()
+    compiled = {}
+    get_bytecode = ScriptCache.get_bytecode
+
+    def shared_get_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in compiled:
+                compiled[script_path] = get_bytecode(self, script_path)
+            return compiled[script_path]
+
+    ScriptCache.get_bytecode = shared_get_bytecode
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is the peak (KiB on Linux, bytes on macOS)
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class ResourceSampler:
+    """Sample CPU time and RSS of this process in a background thread."""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss_bytes())
+        self.wall = time.perf_counter() - self._wall0
+        self.cpu = time.process_time() - self._cpu0
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def find_widget(widgets, label):
+    """Return the widget with the given label, or None."""
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+def render_errors(at):
+    """Problems with a finished rerun: script exceptions or a page that did not render.
+
+    Compile errors do not show up in ``at.exception``, so a page without the
+    title or the species/tissue selectboxes is also reported.
+    """
+    if at.exception:
+        return [at.exception[0].message]
+    missing = [
+        label for label in ("Select Species", "Select Tissue")
+        if find_widget(at.selectbox, label) is None
+    ]
+    if not at.title:
+        missing.insert(0, "title")
+    return [f"page missing {', '.join(missing)}"] if missing else []
+
+
+def timed(step, latencies, errors, action):
+    """Run one rerun, recording its latency and any render error."""
+    t0 = time.perf_counter()
+    at = action()
+    latencies.append((step, time.perf_counter() - t0))
+    errors.extend(f"{step}: {error}" for error in render_errors(at))
+    return at
+
+
+def run_session(seed, rounds, timeout):
+    """Drive one session through ``rounds`` interaction sequences.
+
+    Returns the (step, latency) pairs, the errors and the steps skipped
+    because their widget was absent or had nothing to change.
+    """
+    rng = random.Random(seed)
+    latencies, errors, skipped = [], [], []
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at = timed("load", latencies, errors, at.run)
+
+    for _ in range(rounds):
+        # Change species / tissue
+        for label, step in (("Select Species", "species"), ("Select Tissue", "tissue")):
+            box = find_widget(at.selectbox, label)
+            if box is not None and len(box.options) > 1:
+                value = rng.choice(box.options)
+                at = timed(step, latencies, errors, box.select(value).run)
+            else:
+                skipped.append(step)
+
+        # Move the #Evidence threshold slider (absent when max count is 1)
+        slider = find_widget(at.slider, "#Evidence Threshold")
+        if slider is not None and slider.max > slider.min:
+            value = rng.randint(slider.min, slider.max)
+            at = timed("threshold", latencies, errors, slider.set_value(value).run)
+        else:
+            skipped.append("threshold")
+
+        # Select a Section 3 row. AgGrid is a custom component that AppTest
+        # cannot click, so set the selection state the grid callback writes.
+        at.session_state["s3_selected_row"] = rng.randint(0, 9)
+        at = timed("select_row", latencies, errors, at.run)
+
+        # Close the detail card (absent when the row index is out of range)
+        close = [b for b in at.button if b.key == "close_detail"]
+        if close:
+            at = timed("close_card", latencies, errors, close[0].click().run)
+        else:
+            skipped.append("close_card")
+
+    return latencies, errors, skipped
+
+
+def run_level(n_sessions, rounds, timeout, seed):
+    """Run ``n_sessions`` concurrent sessions and summarise the results."""
+    latencies, errors, skipped = [], [], []
+    with ResourceSampler() as sampler:
+        with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+            futures = [
+                pool.submit(run_session, seed + i, rounds, timeout)
+                for i in range(n_sessions)
+            ]
+            for future in futures:
+                session_latencies, session_errors, session_skipped = future.result()
+                latencies.extend(session_latencies)
+                errors.extend(session_errors)
+                skipped.extend(session_skipped)
+
+    values = [lat * 1000 for _, lat in latencies]
+    by_step = {}
+    for step, lat in latencies:
+        by_step.setdefault(step, []).append(lat * 1000)
+
+    return {
+        "sessions": n_sessions,
+        "reruns": len(values),
+        "p50_ms": percentile(values, 50),
+        "p90_ms": percentile(values, 90),
+        "p99_ms": percentile(values, 99),
+        "max_ms": max(values),
+        "mean_ms": statistics.fmean(values),
+        "reruns_per_s": len(values) / sampler.wall,
+        "cpu_pct": 100 * sampler.cpu / sampler.wall,
+        "peak_rss_mb": sampler.peak_rss / 2**20,
+        "step_p50_ms": {step: percentile(v, 50) for step, v in by_step.items()},
+        "errors": errors,
+        "skipped": {step: skipped.count(step) for step in sorted(set(skipped))},
+    }
+
+
+def print_table(results):
+    header = (
+        f"{'N':>4} {'reruns':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'rerun/s':>8} {'CPU %':>7} {'RSS MB':>8} {'errors':>6} {'skipped':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['sessions']:>4} {r['reruns']:>7} {r['p50_ms']:>8.1f} {r['p90_ms']:>8.1f} "
+            f"{r['p99_ms']:>8.1f} {r['max_ms']:>8.1f} {r['reruns_per_s']:>8.1f} "
+            f"{r['cpu_pct']:>7.1f} {r['peak_rss_mb']:>8.1f} {len(r['errors']):>6} "
+            f"{sum(r['skipped'].values()):>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sessions", default="1,2,4,8",
+        help="comma-separated concurrent session counts (default: 1,2,4,8)",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=3,
+        help="interaction sequences per session (default: 3)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=120,
+        help="per-rerun timeout in seconds (default: 120)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    # The app reads data/ and assets/ relative to the working directory
+    os.chdir(ROOT)
+    share_server_state()
+
+    # Fill the shared st.cache_resource data and index so the levels measure
+    # reruns, not the one-off Excel load. A broken app would only benchmark
+    # as fast, so stop here if the page does not render.
+    t0 = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+    errors = render_errors(at)
+    if errors:
+        sys.exit(f"App did not render: {errors[0]}")
+    print(f"Cold load (fills the data cache): {time.perf_counter() - t0:.2f} s\n")
+
+    results = [run_level(n, args.rounds, args.timeout, args.seed) for n in levels]
+    print_table(results)
+
+    for r in results:
+        for error in r["errors"][:5]:
+            print(f"[N={r['sessions']}] {error}", file=sys.stderr)
+        if r["skipped"]:
+            print(f"[N={r['sessions']}] skipped steps: {r['skipped']}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
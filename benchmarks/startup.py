@@ -0,0 +1,160 @@
+"""Startup profile and time-to-first-paint benchmark for the Streamlit app.
+
+Reports, each in fresh interpreters:
+
+- import time of app.py's module-level imports (``python -X importtime``),
+  and of the modules app.py defers until they are needed;
+- time from process launch to the app's startup stages, as logged by
+  ``log_startup`` in app.py: ``first_paint`` (intro rendered), ``data_loaded``
+  and ``rendered`` (whole page).
+
+The app runs under Streamlit's ``AppTest`` rather than a full server, so
+treat the numbers as a benchmark to track between changes.
+
+Usage (from the repository root):
+
+    python benchmarks/startup.py --repeat 5 --max-first-paint-ms 3000
+"""
+
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+# Imported by app.py only on the paths that need them
+DEFERRED_MODULES = ["st_aggrid", "openpyxl"]
+
+STAGES = ["first_paint", "data_loaded", "rendered"]
+
+# Run in a fresh interpreter: record the app's startup log, then print it
+CHILD = """
+import json, logging, sys
+
+marks = {}
+
+class Marks(logging.Handler):
+    def emit(self, record):
+        marks.setdefault(record.args[0], record.created)
+
+log = logging.getLogger("cell_type_anno.startup")
+log.setLevel(logging.DEBUG)
+log.addHandler(Marks())
+log.propagate = False
+
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])).run()
+marks["errors"] = [e.message for e in at.exception]
+print(json.dumps(marks))
+"""
+
+
+def module_imports(path):
+    """Module-level import statements of ``path`` and the packages they name."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    names = set()
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        else:
+            names.add(node.module.split(".")[0])
+    return "\n".join(ast.unparse(node) for node in nodes), names
+
+
+def import_profile(code, modules):
+    """Run ``code`` under -X importtime; return {module: cumulative s} for ``modules``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        # Nested imports are indented; keep only the ones the code asked for
+        if not name.startswith("  ") and name.strip() in modules:
+            profile[name.strip()] = int(cumulative) / 1e6
+    return profile
+
+
+def time_startup(timeout):
+    """Launch one cold process running the app; return seconds to each stage."""
+    launched = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, APP_PATH, str(timeout)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    marks = json.loads(proc.stdout.strip().splitlines()[-1])
+    if marks["errors"]:
+        raise RuntimeError(f"app raised: {marks['errors'][0]}")
+    return {stage: marks[stage] - launched for stage in STAGES if stage in marks}
+
+
+def print_profile(title, profile, total_label):
+    print(title)
+    for name, seconds in sorted(profile.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<40} {seconds * 1000:>8.1f} ms")
+    print(f"  {total_label:<40} {sum(profile.values()) * 1000:>8.1f} ms\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="cold starts to time (default: 5)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300,
+        help="timeout in seconds for one app run (default: 300)",
+    )
+    parser.add_argument(
+        "--max-first-paint-ms", type=float,
+        help="exit with status 1 if the median time to first paint exceeds this",
+    )
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    eager_code, eager_modules = module_imports(APP_PATH)
+    eager = import_profile(eager_code, eager_modules)
+    print_profile("Module-level imports of app.py:", eager, "total")
+
+    deferred_code = eager_code + "\n" + "\n".join(f"import {m}" for m in DEFERRED_MODULES)
+    deferred = import_profile(deferred_code, set(DEFERRED_MODULES))
+    print_profile("Deferred imports (paid when first needed):", deferred, "total")
+
+    runs = [time_startup(args.timeout) for _ in range(args.repeat)]
+    summary = {
+        stage: statistics.median(run[stage] for run in runs)
+        for stage in STAGES if all(stage in run for run in runs)
+    }
+    print(f"Cold start, median of {args.repeat} (from process launch):")
+    for stage, seconds in summary.items():
+        print(f"  {stage:<40} {seconds * 1000:>8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"imports": eager, "deferred_imports": deferred, "runs": runs, "median": summary},
+                f, indent=2,
+            )
+
+    limit = args.max_first_paint_ms
+    if limit is not None and summary.get("first_paint", float("inf")) * 1000 > limit:
+        print(f"\nFirst paint exceeds {limit:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,16 +17,24 @@ MAMBA_PATH="/home/hzl/miniforge3/bin/mamba"
 PORT="6052"
 APP_FILE="app.py"
 REQUIREMENTS_FILE="requirements.txt"
+# Written after a successful install; records the environment and requirements it installed
+DEPS_STAMP=".deps_installed"
 
 echo -e "${GREEN}========================================${NC}"
 echo -e "${GREEN}  Cellmarker Annotation App Deployment${NC}"
 echo -e "${GREEN}========================================${NC}"
 echo ""
 
+# Fingerprint of what an install depends on: the target environment and requirements.txt
+deps_fingerprint() {
+    { echo "${MAMBA_PATH}"; echo "${CONDA_ENV}"; cat ${REQUIREMENTS_FILE}; } | sha256sum
+}
+
 # Function to install dependencies
 install_dependencies() {
     echo -e "${YELLOW}Checking dependencies...${NC}"
     ${MAMBA_PATH} run -n ${CONDA_ENV} pip install -r ${REQUIREMENTS_FILE} --quiet
+    deps_fingerprint > ${DEPS_STAMP}
     echo -e "${GREEN}Dependencies installed successfully.${NC}"
 }
 
@@ -36,9 +44,11 @@ if [ "$1" == "--install" ]; then
     exit 0
 fi
 
-# Check if dependencies are already installed
+# Check if dependencies are already installed: compare the environment and
+# requirements.txt with the stamp of the last install instead of booting an
+# extra Python interpreter
 echo -e "${YELLOW}Checking if dependencies are installed...${NC}"
-if ! ${MAMBA_PATH} run -n ${CONDA_ENV} python -c "import streamlit, pandas, openpyxl" 2>/dev/null; then
+if [ "$(deps_fingerprint)" != "$(cat ${DEPS_STAMP} 2>/dev/null)" ]; then
     echo -e "${YELLOW}Dependencies not found. Installing...${NC}"
     install_dependencies
 else
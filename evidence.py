@@ -0,0 +1,159 @@
+"""Precomputed evidence counts for Sections 1-2.
+
+EvidenceIndex counts evidence per (technology_seq, species, tissue_class,
+cell_type, cell_name, marker, Symbol) key as cumulative-by-year arrays, so
+the #Evidence of any publication-year window is one subtraction per key
+instead of a re-filter and regroup of the raw table. Counts are kept both as
+raw rows and as distinct PMIDs; as one PMID's rows may list different years,
+distinct PMIDs in a year window are counted from the scope's distinct
+(key, PMID, year) triples instead.
+"""
+
+import numpy as np
+import pandas as pd
+
+# technology_seq value under which every row is counted, whatever its technology
+ALL_TECHNOLOGIES = "All"
+
+SCOPE_COLUMNS = ["technology_seq", "species", "tissue_class"]
+MARKER_COLUMNS = ["cell_type", "cell_name", "marker", "Symbol"]
+
+
+def _cumulative_by_year(codes, year_offsets, n_keys, n_years):
+    """Running totals per key; column j counts rows published before first_year + j."""
+    width = n_years + 1
+    counts = np.bincount(codes * width + year_offsets + 1, minlength=n_keys * width)
+    return counts.reshape(n_keys, width).cumsum(axis=1, dtype=np.int32)
+
+
+def _study_ids(pmids):
+    """PMIDs with each missing one replaced by its own negative id.
+
+    Rows without a PMID cannot be matched to a study, so each one counts as
+    a separate study.
+    """
+    return np.where(np.isnan(pmids), -np.arange(1, len(pmids) + 1), pmids)
+
+
+def _first_of_each(*columns):
+    """Mask keeping one row per distinct combination of ``columns``.
+
+    The rows are sorted on the columns and the first row of each run of
+    equal values is kept.
+    """
+    order = np.lexsort(columns[::-1])
+    run_start = np.zeros(len(order), dtype=bool)
+    run_start[:1] = True
+    for column in columns:
+        ordered = column[order]
+        run_start[1:] |= ordered[1:] != ordered[:-1]
+
+    first = np.zeros(len(order), dtype=bool)
+    first[order[run_start]] = True
+    return first
+
+
+class EvidenceIndex:
+    """Evidence counts per key, queryable by technology and year window.
+
+    Keys are sorted so that each (technology_seq, species, tissue_class)
+    scope is one contiguous block, looked up in O(1). Rows without a year
+    only count when the full year range is selected.
+    """
+
+    def __init__(self, df):
+        year = pd.to_numeric(df["year"], errors="coerce").to_numpy(dtype=float)
+        known = ~np.isnan(year)
+        self.first_year = int(year[known].min()) if known.any() else 0
+        self.last_year = int(year[known].max()) if known.any() else 0
+        n_years = self.last_year - self.first_year + 1
+
+        # Count every row under its own technology and under ALL_TECHNOLOGIES
+        base = df[SCOPE_COLUMNS[1:] + MARKER_COLUMNS]
+        both = pd.concat(
+            [
+                base.assign(technology_seq=df["technology_seq"]),
+                base.assign(technology_seq=ALL_TECHNOLOGIES),
+            ],
+            ignore_index=True,
+        )
+        year = np.concatenate([year, year])
+        known = np.concatenate([known, known])
+        pmids = pd.to_numeric(df["PMID"], errors="coerce").to_numpy(dtype=float)
+        pmids = np.concatenate([pmids, pmids])
+
+        grouped = both.groupby(SCOPE_COLUMNS + MARKER_COLUMNS, dropna=False, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        self.keys = grouped.size().index.to_frame(index=False)
+        n_keys = len(self.keys)
+
+        self.row_totals = np.bincount(codes, minlength=n_keys)
+        self.row_cumulative = _cumulative_by_year(
+            codes[known], year[known].astype(np.int64) - self.first_year, n_keys, n_years
+        )
+
+        # Totals over one row per distinct (key, PMID)
+        studies = _study_ids(pmids)
+        self.pmid_totals = np.bincount(codes[_first_of_each(codes, studies)], minlength=n_keys)
+
+        # A PMID counts in a year window if any of its rows does, which a
+        # cumulative table cannot express when its rows list different years.
+        # Keep the dated (key, PMID, year) triples, sorted by key, so a window
+        # only has to look at its scope's triples.
+        dated = _first_of_each(codes, studies, year) & known
+        order = np.argsort(codes[dated], kind="stable")
+        self.pmid_codes = codes[dated][order]
+        self.pmid_studies = studies[dated][order]
+        self.pmid_years = year[dated][order]
+
+        self._scopes = {
+            scope: slice(rows.min(), rows.max() + 1)
+            for scope, rows in self.keys.groupby(SCOPE_COLUMNS, sort=False).indices.items()
+        }
+
+    def technologies(self):
+        """Technologies that appear in the data, sorted."""
+        techs = self.keys["technology_seq"].dropna().unique().tolist()
+        return sorted(t for t in techs if t != ALL_TECHNOLOGIES)
+
+    def counts(
+        self, species, tissue_class, technology=ALL_TECHNOLOGIES, years=None, distinct_pmids=False
+    ):
+        """Evidence count per cell type & marker pair in one species & tissue.
+
+        Args:
+            species: species to count in
+            tissue_class: tissue class to count in
+            technology: a technology_seq value, or ALL_TECHNOLOGIES
+            years: inclusive (first, last) publication-year window; None
+                or the full range also counts rows without a year
+            distinct_pmids: count distinct publications instead of rows
+
+        Returns:
+            DataFrame of MARKER_COLUMNS plus ``count``, zero counts dropped
+        """
+        scope = self._scopes.get((technology, species, tissue_class))
+        if scope is None:
+            return pd.DataFrame(columns=MARKER_COLUMNS + ["count"])
+
+        if years is None or tuple(years) == (self.first_year, self.last_year):
+            count = (self.pmid_totals if distinct_pmids else self.row_totals)[scope]
+        elif distinct_pmids:
+            count = self._distinct_pmids_in_window(scope, years)
+        else:
+            first = max(int(years[0]), self.first_year) - self.first_year
+            last = min(int(years[1]), self.last_year) - self.first_year
+            cumulative = self.row_cumulative[scope]
+            count = cumulative[:, last + 1] - cumulative[:, first]
+
+        df_counts = self.keys.iloc[scope][MARKER_COLUMNS].assign(count=count)
+        return df_counts[df_counts["count"] > 0].reset_index(drop=True)
+
+    def _distinct_pmids_in_window(self, scope, years):
+        """Distinct PMIDs per key of ``scope`` with a row in the inclusive ``years``."""
+        lo, hi = np.searchsorted(self.pmid_codes, [scope.start, scope.stop])
+        in_window = (self.pmid_years[lo:hi] >= years[0]) & (self.pmid_years[lo:hi] <= years[1])
+        codes = self.pmid_codes[lo:hi][in_window]
+        studies = self.pmid_studies[lo:hi][in_window]
+        first = _first_of_each(codes, studies)
+        return np.bincount(codes[first] - scope.start, minlength=scope.stop - scope.start)
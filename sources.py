@@ -0,0 +1,205 @@
+"""Evidence source adapters.
+
+Each adapter maps one database's file format onto the CellMarker schema
+used by app.py. ``load_sources`` reads the configured sources in parallel
+worker processes and merges them into one evidence table.
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+# Column layout of Cell_marker_All.xlsx, which every source is mapped onto
+CELLMARKER_COLUMNS = [
+    "species",
+    "tissue_class",
+    "tissue_type",
+    "uberonongology_id",
+    "cancer_type",
+    "cell_type",
+    "cell_name",
+    "cellontology_id",
+    "marker",
+    "Symbol",
+    "GeneID",
+    "Genetype",
+    "Genename",
+    "UNIPROTID",
+    "technology_seq",
+    "marker_source",
+    "PMID",
+    "Title",
+    "journal",
+    "year",
+]
+
+# Rows agreeing on these columns are the same evidence, whichever source lists them.
+# Rows without a PMID cannot be matched to a study, so they are never merged.
+DEDUP_COLUMNS = ["species", "tissue_class", "cell_name", "Symbol", "PMID"]
+
+# Extra column naming the database(s) each row comes from
+DATABASE_COLUMN = "database"
+
+
+class SourceAdapter(ABC):
+    """Read one evidence file and map it onto CELLMARKER_COLUMNS.
+
+    Subclasses implement ``read`` (file -> raw DataFrame) and ``to_schema``
+    (raw DataFrame -> CellMarker column names and values). Adapters are
+    pickled into worker processes, so keep them to plain attributes.
+    """
+
+    name = None
+
+    def __init__(self, path, name=None):
+        self.path = path
+        if name is not None:
+            self.name = name
+
+    @abstractmethod
+    def read(self):
+        """Read the source file into a DataFrame."""
+
+    @abstractmethod
+    def to_schema(self, df):
+        """Map the DataFrame from ``read`` onto CellMarker column names and values."""
+
+    def load(self):
+        """Return this source's rows in the CellMarker schema."""
+        df = self.to_schema(self.read())
+
+        # Schema columns first; keep any extra columns the source provides
+        extra_cols = [col for col in df.columns if col not in CELLMARKER_COLUMNS]
+        df = df.reindex(columns=CELLMARKER_COLUMNS + extra_cols)
+
+        # Same dtype in every source, so dedup hashes agree across sources
+        df["PMID"] = pd.to_numeric(df["PMID"], errors="coerce")
+        df["year"] = pd.to_numeric(df["year"], errors="coerce")
+        df[DATABASE_COLUMN] = self.name
+        return df
+
+
+class CellMarkerSource(SourceAdapter):
+    """CellMarker 2.0 export (Cell_marker_All.xlsx), already in the schema."""
+
+    name = "CellMarker 2.0"
+
+    def read(self):
+        return pd.read_excel(self.path)
+
+    def to_schema(self, df):
+        return df
+
+
+class PanglaoDBSource(SourceAdapter):
+    """PanglaoDB marker table (PanglaoDB_markers_*.tsv)."""
+
+    name = "PanglaoDB"
+
+    SPECIES = {"Hs": "Human", "Mm": "Mouse"}
+
+    def read(self):
+        return pd.read_csv(self.path, sep="\t")
+
+    def to_schema(self, df):
+        # "Mm Hs" rows hold for both species
+        df = df.assign(species=df["species"].str.split()).explode("species")
+        return pd.DataFrame({
+            "species": df["species"].map(self.SPECIES),
+            "tissue_class": df["organ"],
+            "cell_type": "Normal cell",
+            "cell_name": df["cell type"],
+            "marker": df["official gene symbol"],
+            "Symbol": df["official gene symbol"],
+            "Genetype": df["gene type"],
+            "Genename": df["product description"],
+        })
+
+
+class CuratedListSource(SourceAdapter):
+    """In-house marker list (.csv/.tsv/.xlsx) using CellMarker column names.
+
+    At least species, tissue_class, cell_name and Symbol are required;
+    ``marker`` defaults to ``Symbol`` when missing.
+    """
+
+    name = "Curated"
+
+    def read(self):
+        ext = os.path.splitext(self.path)[1].lower()
+        if ext in (".xlsx", ".xls"):
+            return pd.read_excel(self.path)
+        return pd.read_csv(self.path, sep="\t" if ext == ".tsv" else ",")
+
+    def to_schema(self, df):
+        missing = {"species", "tissue_class", "cell_name", "Symbol"} - set(df.columns)
+        if missing:
+            raise ValueError(f"{self.path}: missing columns {sorted(missing)}")
+        if "marker" not in df.columns:
+            df = df.assign(marker=df["Symbol"])
+        return df
+
+
+def _load_source(source):
+    return source.load()
+
+
+def merge_sources(frames, names):
+    """Concatenate per-source frames, dropping evidence already seen.
+
+    Rows are keyed by a hash of DEDUP_COLUMNS. A row from a later source
+    whose key already occurs in an earlier source is dropped, and the later
+    source's name is appended to DATABASE_COLUMN of the rows kept. Rows
+    without a PMID and duplicates within one source are kept as they are
+    separate entries (e.g. different tissue_type). Runs in time linear in
+    the total rows.
+    """
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    df = pd.concat(frames, ignore_index=True)
+    src = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    key = pd.util.hash_pandas_object(df[DEDUP_COLUMNS], index=False).to_numpy()
+    has_pmid = df["PMID"].notna().to_numpy()
+
+    # The earliest source listing each key owns it
+    first_src = src.copy()
+    first_src[has_pmid] = pd.Series(src[has_pmid]).groupby(key[has_pmid]).transform("min").to_numpy()
+    keep = src == first_src
+
+    # Later sources that also list a key, for provenance
+    pairs = pd.DataFrame({"key": key[has_pmid], "src": src[has_pmid]}).drop_duplicates()
+    pairs = pairs[pairs["src"].to_numpy() != first_src[has_pmid][pairs.index]]
+    also_in = (
+        pairs.assign(name=np.asarray(names, dtype=object)[pairs["src"].to_numpy()])
+        .groupby("key")["name"]
+        .agg("; ".join)
+    )
+
+    df = df[keep].reset_index(drop=True)
+    if len(also_in):
+        extra = pd.Series(key[keep]).map(also_in)
+        has_extra = (extra.notna() & pd.Series(has_pmid[keep])).to_numpy()
+        df.loc[has_extra, DATABASE_COLUMN] = (
+            df.loc[has_extra, DATABASE_COLUMN] + "; " + extra[has_extra].to_numpy()
+        )
+    return df
+
+
+def load_sources(sources, max_workers=None):
+    """Load every source (in parallel when there are several) and merge them."""
+    if len(sources) == 1:
+        frames = [sources[0].load()]
+    else:
+        # Only needed for several sources, so not imported at startup
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = max_workers or min(len(sources), os.cpu_count() or 1)
+        # spawn, not fork: the Streamlit server process is multi-threaded
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            frames = list(pool.map(_load_source, sources))
+    return merge_sources(frames, [source.name for source in sources])